@@ -2,10 +2,15 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
 import pymongo
+from pymongo.collection import Collection
 import re
+import io
 import os  # 导入 os 模块以读取环境变量
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 
 # --- 1. 页面配置与常量定义 ---
 st.set_page_config(
@@ -23,15 +28,40 @@ CITY_NORMALIZATION_MAP: Dict[str, str] = {
     'jersey city': 'Jersey City',
 }
 KEYWORDS: List[str] = ['Operator', 'Forklift', 'Lead', 'Supervisor', 'Manager', 'Associate', 'Technician', 'Driver', 'Picker', 'Packer']
+# 匹配预先转为小写的标题列 (_title_lower), 因此无需 IGNORECASE
+KEYWORD_PATTERN = re.compile('(' + '|'.join(re.escape(k.lower()) for k in KEYWORDS) + ')')
+KEYWORD_LOOKUP: Dict[str, str] = {k.lower(): k for k in KEYWORDS}
+SALARY_NUMBER_PATTERN = re.compile(r'(\d+\.?\d*)')
 DISPLAY_COLUMNS: List[str] = ['title', 'company', 'city', 'pay_period', 'benefits', 'salary', 'hourly_rate', 'url']
 DOWNLOAD_COLUMNS: List[str] = ['title', 'company', 'city', 'original_city', 'pay_period', 'benefits', 'salary', 'hourly_rate', 'url']
+TABLE_PAGE_SIZE: int = 500
+MONGO_PROJECTION: Dict[str, int] = {"_id": 0, "title": 1, "company": 1, "location": 1, "salary": 1, "benefits": 1, "url": 1}
+
+# 清洗后数据的本地 Parquet 缓存目录 (可选, 通过环境变量 PARQUET_CACHE_DIR 启用, 默认关闭)
+# Heroku 的文件系统在每次 dyno 重启和部署时都会被清空, 该缓存在 Heroku 上无法跨重启生效,
+# 仅适用于拥有持久磁盘的部署环境
+PARQUET_CACHE_DIR: Optional[str] = os.environ.get('PARQUET_CACHE_DIR')
+
+# 筛选条件元组: (数据版本号, 城市, 薪资类型, 最低时薪, 最高时薪, 职位关键词)
+# 数据版本号由 load_data 返回, 数据更新后下游缓存随之失效
+FilterKey = Tuple[str, str, Tuple[str, ...], float, float, str]
+# 以筛选条件为键的缓存条目上限; 滑块每个取值都会产生新键, 需限制内存占用
+FILTER_CACHE_MAX_ENTRIES: int = 32
 
 
 # --- 2. 数据加载与处理模块 ---
 
+@st.cache_resource
+def get_mongo_collection(conn_str: str, db_name: str, collection_name: str) -> Collection:
+    """创建 MongoDB 客户端并在进程内复用 (连接池), 避免每次缓存过期都重新握手"""
+    client = pymongo.MongoClient(conn_str, maxPoolSize=10)
+    # 强制进行一次连接测试，以确保网络和认证无误
+    client.server_info()
+    return client[db_name][collection_name]
+
 @st.cache_data(ttl=600)
-def load_data() -> pd.DataFrame:
-    """从 MongoDB 加载数据 (已适配 Heroku)"""
+def load_data() -> Tuple[pd.DataFrame, str]:
+    """从 MongoDB 加载数据并完成清洗 (已适配 Heroku), 返回清洗结果及其数据版本号; 启用时持久化到本地 Parquet 缓存"""
     
     # 从 Heroku 的环境变量 (Config Vars) 中读取凭证
     MONGO_CONN_STR = os.environ.get('MONGO_CONN_STR')
@@ -41,53 +71,119 @@ def load_data() -> pd.DataFrame:
     # 检查环境变量是否都已设置
     if not all([MONGO_CONN_STR, DB_NAME, COLLECTION_NAME]):
         st.error("数据库配置缺失！请检查 Heroku > Settings > Config Vars 中是否已正确设置 MONGO_CONN_STR, DB_NAME, 和 COLLECTION_NAME。")
-        return pd.DataFrame()
+        return pd.DataFrame(), ''
         
     try:
-        client = pymongo.MongoClient(MONGO_CONN_STR)
-        # 强制进行一次连接测试，以确保网络和认证无误
-        client.server_info() 
-        db = client[DB_NAME]
-        collection = db[COLLECTION_NAME]
-        data = list(collection.find({}, {"_id": 0}))
-        df = pd.DataFrame(data)
-        return df
+        collection = get_mongo_collection(MONGO_CONN_STR, DB_NAME, COLLECTION_NAME)
+        cache_path = None
+        if PARQUET_CACHE_DIR:
+            # 以文档数量 + 最新 _id 作为数据版本号; 命中磁盘缓存时跳过下载与清洗.
+            # 注意: 原地修改已有文档不会改变版本号, 此时需手动清理缓存目录
+            latest = collection.find_one(sort=[('_id', -1)], projection={'_id': 1})
+            data_version = f"{collection.estimated_document_count()}_{latest['_id'] if latest else 'empty'}"
+            cache_path = os.path.join(PARQUET_CACHE_DIR, f"{data_version}.parquet")
+            cached_df = read_parquet_cache(cache_path)
+            if cached_df is not None:
+                return cached_df, data_version
+        else:
+            # 未启用磁盘缓存时, 每次重新加载都视为新的数据版本
+            data_version = pd.Timestamp.now().isoformat()
+        # 仅拉取仪表盘用到的字段, 并在服务端过滤掉无薪资信息的文档
+        cursor = collection.find({"salary": {"$ne": None}}, MONGO_PROJECTION).batch_size(1000)
+        raw_df = pd.DataFrame.from_records(cursor)
     except Exception as e:
         st.error(f"连接 MongoDB 失败: {e}")
-        return pd.DataFrame()
+        return pd.DataFrame(), ''
+
+    if raw_df.empty:
+        return raw_df, data_version
+    df = clean_and_process_data(raw_df)
+    if df.empty:
+        st.error("数据清洗后无有效记录。请检查原始数据。")
+        return df, data_version
+
+    if cache_path:
+        write_parquet_cache(df, cache_path)
+    return df, data_version
+
+def read_parquet_cache(cache_path: str) -> Optional[pd.DataFrame]:
+    """读取本地 Parquet 缓存; 文件不存在或无法读取时返回 None, 并删除无法读取的文件"""
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        df = pd.read_parquet(cache_path, engine='pyarrow')
+    except Exception:
+        # 例如进程在写入过程中被终止而留下的残缺文件; 删除后由调用方重新从 MongoDB 拉取
+        try:
+            os.remove(cache_path)
+        except OSError:
+            pass
+        return None
+    # pyarrow 会将列表列还原为 numpy 数组, 转回 list 以与直接从 MongoDB 加载时保持一致
+    df['benefits'] = df['benefits'].map(list)
+    return df
+
+def write_parquet_cache(df: pd.DataFrame, cache_path: str):
+    """将清洗后的数据写入本地 Parquet 缓存, 并清理旧版本的缓存文件"""
+    tmp_path = f"{cache_path}.tmp"
+    try:
+        os.makedirs(PARQUET_CACHE_DIR, exist_ok=True)
+        # 先写入临时文件再原子替换, 避免写入中断时留下残缺的缓存文件
+        df.to_parquet(tmp_path, engine='pyarrow', compression='zstd')
+        os.replace(tmp_path, cache_path)
+        for name in os.listdir(PARQUET_CACHE_DIR):
+            if name.endswith(('.parquet', '.parquet.tmp')) and name != os.path.basename(cache_path):
+                os.remove(os.path.join(PARQUET_CACHE_DIR, name))
+    except Exception as e:
+        # 磁盘缓存仅用于加速冷启动, 写入失败 (如对象列类型混杂导致 pyarrow 无法转换) 不影响本次使用
+        st.warning(f"写入本地数据缓存失败: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
 
-@st.cache_data
 def clean_and_process_data(_df: pd.DataFrame) -> pd.DataFrame:
     """对原始 DataFrame 进行完整的清洗、解析和标准化"""
     df = _df.copy()
 
-    def parse_salary_intelligently(salary_str: Any) -> Dict[str, Any]:
-        if not isinstance(salary_str, str): return {"hourly_rate": None, "pay_period": "Unknown"}
-        s_lower = salary_str.lower().replace(',', '')
-        numbers_str = re.findall(r'\d+\.?\d*', s_lower)
-        if not numbers_str: return {"hourly_rate": None, "pay_period": "Unknown"}
-        avg_salary = sum([float(s) for s in numbers_str]) / len(numbers_str)
-        if 'year' in s_lower: return {"hourly_rate": avg_salary / 2080, "pay_period": "Annual"}
-        if 'month' in s_lower: return {"hourly_rate": avg_salary / 173.33, "pay_period": "Monthly"}
-        if 'week' in s_lower: return {"hourly_rate": avg_salary / 40, "pay_period": "Weekly"}
-        if avg_salary > 2000: return {"hourly_rate": avg_salary / 2080, "pay_period": "Annual (Inferred)"}
-        return {"hourly_rate": avg_salary, "pay_period": "Hourly"}
-
     if 'salary' in df.columns:
-        salary_data = df['salary'].apply(lambda x: pd.Series(parse_salary_intelligently(x)))
-        df = pd.concat([df, salary_data], axis=1)
+        # 向量化解析薪资: 一次性提取所有数字并按行求均值, 避免逐行构造 pd.Series
+        # 非字符串薪资 (如数值) 视为缺失, 与逐行解析时归为 Unknown 的行为一致
+        salary = df['salary']
+        s = salary.where(salary.map(type).eq(str)).astype('string').str.lower().str.replace(',', '', regex=False)
+        numbers = s.str.extractall(SALARY_NUMBER_PATTERN)[0].astype(float)
+        avg = numbers.groupby(level=0).mean().reindex(df.index)
+        conditions = [
+            avg.isna(),
+            s.str.contains('year', na=False, regex=False),
+            s.str.contains('month', na=False, regex=False),
+            s.str.contains('week', na=False, regex=False),
+            avg > 2000,
+        ]
+        df['hourly_rate'] = np.select(conditions, [np.nan, avg / 2080, avg / 173.33, avg / 40, avg / 2080], default=avg)
+        df['pay_period'] = np.select(conditions, ['Unknown', 'Annual', 'Monthly', 'Weekly', 'Annual (Inferred)'], default='Hourly')
     else:
-        df['hourly_rate'], df['pay_period'] = None, 'Unknown'
+        df['hourly_rate'], df['pay_period'] = np.nan, 'Unknown'
 
-    df.dropna(subset=['hourly_rate'], inplace=True)
+    # NaN 与 0 比较结果为 False, 一次布尔索引同时去除缺失值和非正值
     df = df[df['hourly_rate'] > 0]
     if df.empty: return pd.DataFrame()
 
-    df['original_city'] = df['location'].apply(lambda x: x.split(',')[0].strip() if pd.notnull(x) else 'Unknown')
-    df['city'] = df['original_city'].apply(lambda name: CITY_NORMALIZATION_MAP.get(name.lower(), name))
+    df['original_city'] = df['location'].str.split(',', n=1).str[0].str.strip().fillna('Unknown')
+    df['city'] = df['original_city'].str.lower().map(CITY_NORMALIZATION_MAP).fillna(df['original_city'])
     
-    if 'benefits' not in df.columns: df['benefits'] = [[] for _ in range(len(df))]
-    df['benefits'] = df['benefits'].apply(lambda d: d if isinstance(d, list) else [])
+    if 'benefits' not in df.columns: df['benefits'] = None
+    # 仅替换非列表的值 (缺失/异常类型), 每行各自一个新的空列表
+    not_list = df['benefits'].map(type).ne(list)
+    if not_list.any():
+        df.loc[not_list, 'benefits'] = pd.Series([[] for _ in range(not_list.sum())], index=df.index[not_list], dtype=object)
+
+    # 预先计算小写标题, 供关键词筛选与关键词分析复用, 避免每次 case=False 扫描
+    df['_title_lower'] = df['title'].astype('string').str.lower()
+
+    # 低基数字符串列转为分类类型, 后续 isin / value_counts / 分组均基于整数编码
+    for col in ('city', 'pay_period', 'company', 'original_city'):
+        df[col] = df[col].astype('category')
     
     return df
 
@@ -96,8 +192,76 @@ def convert_df_to_csv(df: pd.DataFrame) -> bytes:
     """将 DataFrame 转换为可供下载的 CSV 格式"""
     df_copy = df.copy()
     if 'benefits' in df_copy.columns:
-        df_copy['benefits'] = df_copy['benefits'].apply(lambda x: ', '.join(x) if isinstance(x, list) else x)
-    return df_copy.to_csv(index=False).encode('utf-8')
+        df_copy['benefits'] = df_copy['benefits'].str.join(', ')
+    # 直接写入字节缓冲区, 避免先生成完整 str 再 encode 复制一次
+    buf = io.BytesIO()
+    df_copy.to_csv(buf, index=False, encoding='utf-8')
+    return buf.getvalue()
+
+# 筛选本身不缓存: 直接计算掩码比 st.cache_data 反序列化整份 DataFrame 副本更快
+def apply_filters(df: pd.DataFrame, city: str, pay_periods: Tuple[str, ...],
+                  salary_lo: float, salary_hi: float, keyword: str) -> pd.DataFrame:
+    """按侧边栏筛选条件过滤数据"""
+    # 合并为单个布尔掩码后一次性索引, 避免复制及逐步生成中间 DataFrame
+    hourly_rate = df['hourly_rate'].to_numpy()
+    mask = np.ones(len(df), dtype=bool)
+    mask &= df['pay_period'].isin(pay_periods).to_numpy()
+    mask &= (hourly_rate >= salary_lo) & (hourly_rate <= salary_hi)
+    if city != '-- All Cities --':
+        mask &= (df['city'] == city).to_numpy()
+    if keyword:
+        mask &= df['_title_lower'].str.contains(keyword.lower(), regex=False, na=False).to_numpy(dtype=bool)
+    return df.loc[mask]
+
+# 以下缓存函数只缓存体积较小的汇总结果, 以筛选条件元组 (含数据版本号) 作为缓存键;
+# _df 参数不参与哈希, 它总是当前筛选条件下 apply_filters 的结果
+@st.cache_data(ttl=600, max_entries=FILTER_CACHE_MAX_ENTRIES)
+def compute_keyword_table(_df: pd.DataFrame, filter_key: FilterKey) -> pd.DataFrame:
+    """统计各职位关键词的岗位数与平均时薪"""
+    # 单次正则扫描标题列, 取代按关键词逐个 str.contains
+    matches = _df['_title_lower'].str.extractall(KEYWORD_PATTERN)[0].map(KEYWORD_LOOKUP)
+    matches.index = matches.index.droplevel(1)
+    # 'Lead' 同时计入 'Associate'
+    matches = pd.concat([matches, matches[matches == 'Lead'].replace('Lead', 'Associate')])
+    hits = matches.rename('关键词').to_frame().join(_df['hourly_rate']).set_index('关键词', append=True)
+    # 同一岗位标题中关键词重复出现时只计一次
+    hits = hits[~hits.index.duplicated()]
+    return (hits.groupby(level='关键词')['hourly_rate'].agg(岗位数='size', 平均时薪='mean')
+            .reset_index().sort_values(by="岗位数", ascending=False))
+
+def compute_top_companies(df: pd.DataFrame, top_n: int) -> Tuple[pd.DataFrame, List[str]]:
+    """返回招聘数量前 top_n 的公司及其岗位数据"""
+    company_counts = df['company'].value_counts().head(top_n)
+    # value_counts 已按降序排列, 直接取前 top_n 即可; 分类列的结果会包含当前筛选结果中不存在的类别
+    company_counts = company_counts[company_counts > 0]
+    top_companies = company_counts.index.tolist()
+    return df[df['company'].isin(top_companies)], top_companies
+
+@st.cache_data(ttl=600, max_entries=FILTER_CACHE_MAX_ENTRIES)
+def compute_kpis(_df: pd.DataFrame, filter_key: FilterKey) -> Dict[str, Any]:
+    """一次性计算核心指标及时薪最高的 10 条记录"""
+    if _df.empty:
+        return {"total_jobs": 0, "avg_salary": 0, "median_salary": 0, "outliers": _df}
+    stats = _df['hourly_rate'].agg(['size', 'mean', 'median'])
+    return {
+        "total_jobs": int(stats['size']),
+        "avg_salary": stats['mean'],
+        "median_salary": stats['median'],
+        "outliers": _df.nlargest(10, 'hourly_rate')[['salary', 'pay_period', 'hourly_rate', 'title', 'company', 'city']],
+    }
+
+def compute_box_stats(df: pd.DataFrame, by: List[str]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """按分组在服务端计算箱线图统计量 (四分位数与 1.5 IQR 须线) 及异常值"""
+    stats = df.groupby(by, observed=True)['hourly_rate'].quantile([.25, .5, .75]).unstack()
+    stats.columns = ['q1', 'median', 'q3']
+    iqr = stats['q3'] - stats['q1']
+    limits = pd.DataFrame({'lo': stats['q1'] - 1.5 * iqr, 'hi': stats['q3'] + 1.5 * iqr})
+
+    rows = df[by + ['hourly_rate']].join(limits, on=by)
+    inside = rows['hourly_rate'].between(rows['lo'], rows['hi'])
+    # 须线端点取落在界限内的最小/最大实际值, 与 Plotly 默认行为一致
+    fences = rows[inside].groupby(by, observed=True)['hourly_rate'].agg(lowerfence='min', upperfence='max')
+    return stats.join(fences).reset_index(), rows.loc[~inside, by + ['hourly_rate']]
 
 
 # --- 3. UI 界面渲染模块 ---
@@ -125,12 +289,11 @@ def display_sidebar(df: pd.DataFrame) -> Dict[str, Any]:
         "salary_range": selected_salary_range
     }
 
-def display_kpis_and_diagnostics(df: pd.DataFrame):
+def display_kpis_and_diagnostics(df: pd.DataFrame, filter_key: FilterKey):
     """显示核心指标和极端值诊断模块"""
     st.markdown("### 核心指标")
-    total_jobs = len(df)
-    avg_salary = df['hourly_rate'].mean() if total_jobs > 0 else 0
-    median_salary = df['hourly_rate'].median() if total_jobs > 0 else 0
+    kpis = compute_kpis(df, filter_key)
+    total_jobs, avg_salary, median_salary = kpis['total_jobs'], kpis['avg_salary'], kpis['median_salary']
     col1, col2, col3 = st.columns(3)
     col1.metric("总岗位数", f"{total_jobs}")
     col2.metric("平均时薪", f"${avg_salary:.2f}")
@@ -138,59 +301,91 @@ def display_kpis_and_diagnostics(df: pd.DataFrame):
 
     with st.expander("🔍 点击展开，查看极端值诊断分析"):
         if total_jobs > 0:
-            outliers_df = df.nlargest(10, 'hourly_rate')
-            st.dataframe(outliers_df[['salary', 'pay_period', 'hourly_rate', 'title', 'company', 'city']], use_container_width=True)
+            st.dataframe(kpis['outliers'], use_container_width=True)
         else:
             st.info("当前无数据显示。")
 
-def display_geo_analysis_tab(df: pd.DataFrame, selected_city: str):
+# 图表构建函数以筛选条件元组为缓存键, 切换选项卡或重复交互时跳过图表构建
+@st.cache_data(ttl=600, max_entries=FILTER_CACHE_MAX_ENTRIES)
+def build_geo_fig(_df: pd.DataFrame, filter_key: FilterKey, selected_city: str) -> go.Figure:
+    """构建各城市薪资分布箱线图"""
+    # 仅向前端发送各分组的统计量和异常值, 而非全部数据点
+    stats, outliers = compute_box_stats(_df, ['city', 'pay_period'])
+    fig_box = go.Figure()
+    colors = px.colors.qualitative.Plotly
+    for i, (period, period_stats) in enumerate(stats.groupby('pay_period', observed=True)):
+        color = colors[i % len(colors)]
+        fig_box.add_trace(go.Box(
+            x=period_stats['city'].astype(str), q1=period_stats['q1'], median=period_stats['median'],
+            q3=period_stats['q3'], lowerfence=period_stats['lowerfence'], upperfence=period_stats['upperfence'],
+            name=str(period), legendgroup=str(period), offsetgroup=str(period), marker_color=color, boxpoints=False))
+        period_outliers = outliers[outliers['pay_period'] == period]
+        fig_box.add_trace(go.Scatter(
+            x=period_outliers['city'].astype(str), y=period_outliers['hourly_rate'], mode='markers',
+            legendgroup=str(period), offsetgroup=str(period), marker_color=color, showlegend=False))
+    fig_box.update_layout(title="薪资范围洞察", boxmode='group', scattermode='group', legend_title_text='薪资类型',
+                          xaxis_title='城市', yaxis_title='换算后时薪 ($)')
+    if selected_city != '-- All Cities --':
+        fig_box.update_xaxes(title_text='', showticklabels=False)
+    return fig_box
+
+@st.cache_data(ttl=600, max_entries=FILTER_CACHE_MAX_ENTRIES)
+def build_keyword_fig(_df: pd.DataFrame, filter_key: FilterKey) -> Optional[go.Figure]:
+    """构建职位关键词柱状图; 未匹配到任何关键词时返回 None"""
+    keyword_df = compute_keyword_table(_df, filter_key)
+    if keyword_df.empty:
+        return None
+    return px.bar(keyword_df, x='关键词', y='岗位数', color='平均时薪', title="热门职位关键词及其平均薪资")
+
+@st.cache_data(ttl=600, max_entries=FILTER_CACHE_MAX_ENTRIES)
+def build_company_fig(_df: pd.DataFrame, filter_key: FilterKey, top_n: int) -> go.Figure:
+    """构建 Top N 招聘公司的薪资分布箱线图"""
+    company_df, top_companies = compute_top_companies(_df, top_n)
+    stats, outliers = compute_box_stats(company_df, ['company'])
+    stats = stats.set_index('company').loc[top_companies]
+    fig_comp = go.Figure()
+    colors = px.colors.qualitative.Plotly
+    for i, company in enumerate(top_companies):
+        color = colors[i % len(colors)]
+        row = stats.loc[company]
+        fig_comp.add_trace(go.Box(
+            x=[company], q1=[row['q1']], median=[row['median']], q3=[row['q3']],
+            lowerfence=[row['lowerfence']], upperfence=[row['upperfence']],
+            name=company, legendgroup=company, marker_color=color, boxpoints=False))
+        company_outliers = outliers.loc[outliers['company'] == company, 'hourly_rate']
+        fig_comp.add_trace(go.Scatter(
+            x=[company] * len(company_outliers), y=company_outliers, mode='markers',
+            legendgroup=company, marker_color=color, showlegend=False))
+    fig_comp.update_layout(title=f"Top {top_n} 招聘公司的薪资分布", legend_title_text='公司',
+                           xaxis_title='公司', yaxis_title='换算后时薪 ($)')
+    fig_comp.update_xaxes(tickangle=45, categoryorder='array', categoryarray=top_companies)
+    return fig_comp
+
+def display_geo_analysis_tab(df: pd.DataFrame, selected_city: str, filter_key: FilterKey):
     """渲染地理分析选项卡"""
     st.subheader("各城市薪资水平分布")
     if not df.empty:
-        fig_box = px.box(df, x='city', y='hourly_rate', color='pay_period', title="薪资范围洞察",
-                         labels={'city': '城市', 'hourly_rate': '换算后时薪 ($)', 'pay_period': '薪资类型'})
-        if selected_city != '-- All Cities --':
-            fig_box.update_xaxes(title_text='', showticklabels=False)
-        st.plotly_chart(fig_box, use_container_width=True)
+        st.plotly_chart(build_geo_fig(df, filter_key, selected_city), use_container_width=True)
     else:
         st.warning("无数据显示。")
 
-def display_keyword_analysis_tab(df: pd.DataFrame):
+def display_keyword_analysis_tab(df: pd.DataFrame, filter_key: FilterKey):
     """渲染职位关键词分析选项卡"""
     st.subheader("热门职位关键词分析")
     st.info("ℹ️ 在此图表中, 'Lead' 的数据已被合并到 'Associate' 类别下进行统一分析。")
     if not df.empty:
-        keyword_data = []
-        # KEYWORDS常量中已移除 'Lead'
-        for keyword in KEYWORDS:
-            if keyword == 'Associate':
-                subset = df[df['title'].str.contains('Associate|Lead', case=False, regex=True)]
-            else:
-                subset = df[df['title'].str.contains(keyword, case=False, regex=True)]
-            if not subset.empty:
-                keyword_data.append({'关键词': keyword, '岗位数': len(subset), '平均时薪': subset['hourly_rate'].mean()})
-        if keyword_data:
-            keyword_df = pd.DataFrame(keyword_data).sort_values(by="岗位数", ascending=False)
-            fig_keyword = px.bar(keyword_df, x='关键词', y='岗位数', color='平均时薪', title="热门职位关键词及其平均薪资")
+        fig_keyword = build_keyword_fig(df, filter_key)
+        if fig_keyword is not None:
             st.plotly_chart(fig_keyword, use_container_width=True)
         else:
             st.info("在当前筛选结果中未找到常见的职位关键词。")
 
-def display_company_analysis_tab(df: pd.DataFrame):
+def display_company_analysis_tab(df: pd.DataFrame, filter_key: FilterKey):
     """渲染公司分析选项卡"""
     st.subheader("招聘公司分析")
     if not df.empty:
         top_n = st.slider("选择要分析的公司数量:", 5, 25, 10)
-        company_counts = df['company'].value_counts().nlargest(top_n)
-        top_companies = company_counts.index.tolist()
-        
-        company_df = df[df['company'].isin(top_companies)]
-        
-        fig_comp = px.box(company_df, x='company', y='hourly_rate', color='company', 
-                          category_orders={'company': top_companies}, title=f"Top {top_n} 招聘公司的薪资分布",
-                          labels={'company': '公司', 'hourly_rate': '换算后时薪 ($)'})
-        fig_comp.update_xaxes(tickangle=45)
-        st.plotly_chart(fig_comp, use_container_width=True)
+        st.plotly_chart(build_company_fig(df, filter_key, top_n), use_container_width=True)
     else:
         st.warning("无数据显示。")
 
@@ -200,50 +395,48 @@ def display_data_table(df: pd.DataFrame):
     if not df.empty:
         csv_data = convert_df_to_csv(df[DOWNLOAD_COLUMNS])
         st.download_button(label="📥 下载当前数据 (CSV)", data=csv_data, file_name="warehouse_jobs_filtered.csv", mime='text/csv')
-        st.dataframe(df[DISPLAY_COLUMNS])
+        # 分页显示, 每次仅将当前页数据序列化发送到前端
+        total_pages = (len(df) - 1) // TABLE_PAGE_SIZE + 1
+        page = st.number_input(f"页码 (共 {total_pages} 页, 每页 {TABLE_PAGE_SIZE} 条):", min_value=1, max_value=total_pages, value=1, step=1)
+        start = (page - 1) * TABLE_PAGE_SIZE
+        st.dataframe(df[DISPLAY_COLUMNS].iloc[start:start + TABLE_PAGE_SIZE])
 
 # --- 4. 主程序入口 ---
 def main():
     """主函数，编排整个应用"""
     st.title("🏗️ NJ 仓库工作洞察仪表盘")
     
-    df = load_data()
-    if df.empty:
-        # load_data 函数内部已有错误提示，此处直接返回即可
-        return
-        
-    processed_df = clean_and_process_data(df)
+    processed_df, data_version = load_data()
     if processed_df.empty:
-        st.error("数据清洗后无有效记录。请检查原始数据。")
+        # load_data 函数内部已有错误提示，此处直接返回即可
         return
 
     filters = display_sidebar(processed_df)
     
-    # 应用筛选
-    filtered_df = processed_df.copy()
-    if filters["city"] != '-- All Cities --':
-        filtered_df = filtered_df[filtered_df['city'] == filters["city"]]
-    
-    filtered_df = filtered_df[
-        (filtered_df['pay_period'].isin(filters["pay_periods"])) &
-        (filtered_df['hourly_rate'] >= filters["salary_range"][0]) &
-        (filtered_df['hourly_rate'] <= filters["salary_range"][1])
-    ]
-    
-    if filters["keyword"]:
-        filtered_df = filtered_df[filtered_df['title'].str.contains(filters["keyword"], case=False, na=False)]
+    filtered_df = apply_filters(processed_df, filters["city"], tuple(filters["pay_periods"]),
+                                filters["salary_range"][0], filters["salary_range"][1], filters["keyword"])
+
+    # 指标与图表等汇总结果以筛选条件元组为缓存键, 重复交互时直接复用
+    filter_key: FilterKey = (
+        data_version,
+        filters["city"],
+        tuple(filters["pay_periods"]),
+        filters["salary_range"][0],
+        filters["salary_range"][1],
+        filters["keyword"],
+    )
 
-    display_kpis_and_diagnostics(filtered_df)
+    display_kpis_and_diagnostics(filtered_df, filter_key)
     st.markdown("---")
 
     tab1, tab2, tab3, tab4 = st.tabs(["🌍 地理分析", "🔑 职位关键词", "🏢 公司分析", "📋 详细数据"])
 
     with tab1:
-        display_geo_analysis_tab(filtered_df, filters["city"])
+        display_geo_analysis_tab(filtered_df, filters["city"], filter_key)
     with tab2:
-        display_keyword_analysis_tab(filtered_df)
+        display_keyword_analysis_tab(filtered_df, filter_key)
     with tab3:
-        display_company_analysis_tab(filtered_df)
+        display_company_analysis_tab(filtered_df, filter_key)
     with tab4:
         display_data_table(filtered_df)
 